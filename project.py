@@ -1,45 +1,84 @@
 import random
 import math
-from itertools import combinations
-from collections import Counter
+from itertools import combinations_with_replacement
 import sys
-
-class Card:
-    # Represents a single playing card 
-    ranks = "23456789TJQKA"
-    suits = "cdhs"
-    rank_values = {rank: i for i, rank in enumerate(ranks)}
-
-    def __init__(self, card_str):
+import os
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+# Cards are packed ints in 0..51: rank = card >> 2, suit = card & 3
+RANKS = "23456789TJQKA"
+SUITS = "cdhs"
+RANK_VALUES = {rank: i for i, rank in enumerate(RANKS)}
+
+# Shared random generator for dealing and sampling, seed it to make mcts reproducible
+RNG = random.Random()
+
+# Every accepted spelling of every card (any rank/suit case) mapped to its packed int
+CARD_VALUES = {r + s: (i << 2) | j
+               for i, rank in enumerate(RANKS) for j, suit in enumerate(SUITS)
+               for r in {rank, rank.lower()} for s in {suit, suit.upper()}}
+
+def parse_card(card_str):
+    # Converts a card string such as "Ks" into its packed int
+    card = CARD_VALUES.get(card_str)
+    if card is None:
         if len(card_str) != 2:
             raise ValueError("Card string must be 2 characters")
-        self.rank_str = card_str[0].upper()
-        self.suit_str = card_str[1].lower()
-
-        if self.rank_str not in self.ranks or self.suit_str not in self.suits:
-            raise ValueError(f"Invalid card: {card_str}")
-
-        self.rank_value = self.rank_values[self.rank_str]
-
-    def __str__(self):
-        return self.rank_str + self.suit_str
-
-    def __repr__(self):
-        return self.__str__()
+        raise ValueError(f"Invalid card: {card_str}")
+    return card
 
-    def __eq__(self, other):
-        return isinstance(other, Card) and self.rank_str == other.rank_str and self.suit_str == other.suit_str
+def card_str(card):
+    # Converts a packed int back into its card string
+    return RANKS[card >> 2] + SUITS[card & 3]
 
-    def __hash__(self):
-        return hash((self.rank_str, self.suit_str))
-
-# Helper functions for the deck
-def get_deck():
-    return [Card(r + s) for r in Card.ranks for s in Card.suits]
+# Full deck as a 52-bit mask (bit i set for card i)
+FULL_DECK_MASK = (1 << 52) - 1
 
 # Helper to determine if two hole cards are of the same suit
 def is_suited(card1, card2):
-    return card1.suit_str == card2.suit_str
+    return (card1 ^ card2) & 3 == 0
+
+def cards_to_mask(cards):
+    # Packs a list of int cards into a 52-bit mask
+    mask = 0
+    for card in cards:
+        mask |= 1 << card
+    return mask
+
+def mask_to_cards(mask):
+    # Unpacks a 52-bit mask into a list of int cards, lowest first
+    cards = []
+    while mask:
+        low_bit = mask & -mask
+        cards.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return cards
+
+# BINOMIALS[i][c] = C(c, i), enough to unrank combinations of up to 5 cards from one deck
+BINOMIALS = [[math.comb(c, i) for c in range(53)] for i in range(6)]
+
+def unrank_combo(index, k, n):
+    # Decodes index in [0, C(n, k)) into the k positions of range(n) it stands for in the combinatorial number system
+    # Lets a random subset of combinations be sampled by index without building all of them
+    combo = []
+    c = n
+    for i in range(k, 0, -1):
+        # Largest position below the previous one with C(c, i) <= index
+        c = bisect_right(BINOMIALS[i], index, 0, c) - 1
+        index -= BINOMIALS[i][c]
+        combo.append(c)
+    return combo
+
+def sample_combos(cards, k, limit):
+    # Samples up to limit distinct k-card combinations from cards without building the full list of combinations
+    n_combos = math.comb(len(cards), k)
+    return [tuple(cards[i] for i in unrank_combo(index, k, len(cards)))
+            for index in RNG.sample(range(n_combos), min(limit, n_combos))]
+
+# Hand category for each sum of squared rank counts, when there is no flush or straight
+SHAPE_CATEGORIES = {17: 8, 13: 7, 11: 4, 9: 3, 7: 2, 5: 1}
 
 def evaluate_hand(five_cards):
     # Core hand ranking logic, evaluates a 5-card poker hand and returns a tuple score for comparison
@@ -48,100 +87,138 @@ def evaluate_hand(five_cards):
     if len(five_cards) != 5:
         raise ValueError("evaluate_hand requires exactly 5 cards.")
     
-    # Sort cards by rank value 
-    sorted_cards = sorted(five_cards, key=lambda c: c.rank_value, reverse=True)
-
-    ranks = [c.rank_value for c in sorted_cards]
-    suits = [c.suit_str for c in sorted_cards]
-
-    rank_counts = Counter(ranks)
-    counts_list = sorted(rank_counts.values(), reverse=True)
-    unique_ranks = sorted(rank_counts.keys(), reverse=True)
-
-    is_flush = any(suits.count(s) == 5 for s in Card.suits)
-    is_straight, straight_high_rank_value = check_straight(ranks)
+    ranks = [c >> 2 for c in five_cards]
+    suits = [c & 3 for c in five_cards]
+
+    # Rank histogram and 13-bit rank mask, built in one pass
+    hist = [0] * 13
+    rank_mask = 0
+    for r in ranks:
+        hist[r] += 1
+        rank_mask |= 1 << r
+    # Sum of squared rank counts identifies the pattern of the hand
+    shape = sum(h * h for h in hist)
+
+    # Group ranks by count, highest count first and highest rank first within a count
+    # which is exactly the tie-breaking order of every non-straight category
+    groups = [[], [], [], [], []]
+    for r in range(12, -1, -1):
+        if hist[r]:
+            groups[hist[r]].append(r)
+    ordered_ranks = (*groups[4], *groups[3], *groups[2], *groups[1])
+
+    is_flush = suits[0] == suits[1] == suits[2] == suits[3] == suits[4]
+    if shape == 5:
+        is_straight, straight_high_rank_value = check_straight(rank_mask)
+    else:
+        is_straight = False
 
     # Texas Hold’em hand ranking
     # 9: Straight Flush / Royal Flush
     if is_flush and is_straight:
         return (9, straight_high_rank_value)
-    
-    # 8: Four of a Kind
-    if counts_list[0] == 4:
-        quad_rank = unique_ranks[0] if rank_counts[unique_ranks[0]] == 4 else unique_ranks[1]
-        kicker = [r for r in unique_ranks if r != quad_rank][0]
-        return (8, quad_rank, kicker)
-
-    # 7: Full House
-    if counts_list[0] == 3 and counts_list[1] == 2:
-        trip_rank = unique_ranks[0] if rank_counts[unique_ranks[0]] == 3 else unique_ranks[1]
-        pair_rank = unique_ranks[0] if rank_counts[unique_ranks[0]] == 2 else unique_ranks[1]
-        return (7, trip_rank, pair_rank)
 
     # 6: Flush
     if is_flush:
-        return (6, *unique_ranks) # All 5 ranks for tie-breaking
+        return (6, *ordered_ranks) # All 5 ranks for tie-breaking
 
     # 5: Straight
     if is_straight:
         return (5, straight_high_rank_value)
 
-    # 4: Three of a Kind
-    if counts_list[0] == 3:
-        trip_rank = unique_ranks[0] if rank_counts[unique_ranks[0]] == 3 else unique_ranks[1]
-        kickers = [r for r in unique_ranks if r != trip_rank]
-        return (4, trip_rank, *kickers)
-
-    # 3: Two Pair
-    if counts_list[0] == 2 and counts_list[1] == 2:
-        pair_ranks = sorted([r for r, c in rank_counts.items() if c == 2], reverse=True)
-        kicker = [r for r in unique_ranks if r not in pair_ranks][0]
-        return (3, *pair_ranks, kicker)
-
-    # 2: One Pair
-    if counts_list[0] == 2:
-        pair_rank = [r for r, c in rank_counts.items() if c == 2][0]
-        kickers = [r for r in unique_ranks if r != pair_rank]
-        return (2, pair_rank, *kickers)
+    # 8: Four of a Kind, 7: Full House, 4: Three of a Kind, 3: Two Pair, 2: One Pair, 1: High Card
+    return (SHAPE_CATEGORIES[shape], *ordered_ranks)
 
-    # 1: High Card
-    return (1, *unique_ranks) # All 5 ranks for tie-breaking
-
-def check_straight(ranks):
+def check_straight(rank_mask):
     # Identifies straights, returns the high card of the straight comparison
-    # Checks for a straight in a list of 5 rank values.
+    # Checks for a straight in a 13-bit rank mask (bit r set when rank r is present).
     # Returns (True, high_rank_value) if a straight is found, otherwise (False, None).
-    unique_sorted_ranks = sorted(list(set(ranks))) # Ensure unique and sorted
-    
-    if len(unique_sorted_ranks) < 5:
-        return False, None
-
-    # Check for regular straight
-    is_regular_straight = True
-    for i in range(len(unique_sorted_ranks) - 1):
-        if unique_sorted_ranks[i] + 1 != unique_sorted_ranks[i+1]:
-            is_regular_straight = False
-            break
-    if is_regular_straight:
-        return True, unique_sorted_ranks[-1] # High card of the straight
-
-    ace_low_values = {Card.rank_values['2'], Card.rank_values['3'],
-                      Card.rank_values['4'], Card.rank_values['5'], Card.rank_values['A']}
-    if set(unique_sorted_ranks) == ace_low_values:
-        return True, Card.rank_values['5'] # High card is 5 for A2345 straight
+    # Bit r of run is set when ranks r through r + 4 are all present
+    run = rank_mask & (rank_mask >> 1) & (rank_mask >> 2) & (rank_mask >> 3) & (rank_mask >> 4)
+    if run:
+        return True, run.bit_length() + 3 # High card of the highest straight
+
+    if rank_mask & 0x100F == 0x100F: # A, 2, 3, 4 and 5 present
+        return True, RANK_VALUES['5'] # High card is 5 for A2345 straight
 
     return False, None
 
-def find_best_5_card_hand(hole_cards, community_cards):
-    all_7_cards = hole_cards + community_cards
-    if len(all_7_cards) < 5:
-        return None
-    
-     # Iterate through all combinations of 5 cards from the 7 available
-    return max(evaluate_hand(list(combo)) for combo in combinations(all_7_cards, 5))
+# Cactus Kev style lookup tables, built once at import from evaluate_hand
+# Each rank gets a prime so the product of a hand's rank primes identifies its rank multiset
+RANK_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+def pack_score(score):
+    # Packs an evaluate_hand tuple into a single int with the same ordering (higher is better)
+    value = score[0]
+    for i in range(1, 6):
+        value = (value << 4) | (score[i] if i < len(score) else 0)
+    return value
+
+def build_lookup_tables():
+    # FLUSH_LOOKUP: 13-bit rank mask of a suit with 5+ cards -> best flush score
+    # RANK_LOOKUP: prime product of 5 to 7 ranks -> best non-flush score
+    flush_lookup = [0] * (1 << 13)
+    rank_lookup = {}
+
+    # 5 cards: score every rank combination directly
+    for ranks in combinations_with_replacement(range(13), 5):
+        if ranks[0] == ranks[4]:
+            continue # No five of a kind in one deck
+        product = math.prod(RANK_PRIMES[r] for r in ranks)
+        # Give equal ranks distinct suits and never all the same suit
+        cards = [(r << 2) | (i & 3) for i, r in enumerate(ranks)]
+        rank_lookup[product] = pack_score(evaluate_hand(cards))
+        if len(set(ranks)) == 5:
+            rank_mask = sum(1 << r for r in ranks)
+            flush_lookup[rank_mask] = pack_score(evaluate_hand([r << 2 for r in ranks]))
+
+    # 6 and 7 cards: best of the hands with one card removed
+    for n in (6, 7):
+        for ranks in combinations_with_replacement(range(13), n):
+            if any(ranks[i] == ranks[i + 4] for i in range(n - 4)):
+                continue
+            product = math.prod(RANK_PRIMES[r] for r in ranks)
+            rank_lookup[product] = max(rank_lookup[product // RANK_PRIMES[r]] for r in set(ranks))
+            if len(set(ranks)) == n:
+                rank_mask = sum(1 << r for r in ranks)
+                flush_lookup[rank_mask] = max(flush_lookup[rank_mask & ~(1 << r)] for r in ranks)
+
+    return flush_lookup, rank_lookup
+
+FLUSH_LOOKUP, RANK_LOOKUP = build_lookup_tables()
+
+# Card bits of each suit, suit s owns every fourth bit starting at bit s
+SUIT_MASKS = tuple(0x1111111111111 << s for s in range(4))
+
+def evaluate_mask(mask):
+    # Scores a 5 to 7 card hand given as a bitmask (bit i set for card i)
+    # Returns a packed int score, higher is better
+    # Flush check straight off the mask with one popcount per suit
+    for suit_mask in SUIT_MASKS:
+        suited = mask & suit_mask
+        if suited.bit_count() >= 5:
+            rank_mask = 0
+            while suited:
+                low_bit = suited & -suited
+                rank_mask |= 1 << ((low_bit.bit_length() - 1) >> 2)
+                suited ^= low_bit
+            # A flush always beats the best non-flush hand from 7 cards or fewer
+            return FLUSH_LOOKUP[rank_mask]
+
+    product = 1
+    while mask:
+        low_bit = mask & -mask
+        product *= RANK_PRIMES[(low_bit.bit_length() - 1) >> 2]
+        mask ^= low_bit
+    return RANK_LOOKUP[product]
+
+# Exploration constant for UCB1
+SQRT2 = math.sqrt(2)
 
 class MCTSNode:
     # Represents a node in the Monte Carlo Tree Search tree
+    __slots__ = ('state', 'parent', 'children', 'visits', 'wins', 'untried_actions')
+
     def __init__(self, state, parent=None):
         self.state = state
         self.parent = parent
@@ -150,19 +227,18 @@ class MCTSNode:
         self.wins = 0
         self.untried_actions = state.get_possible_actions()
 
-    def ucb1(self, c=math.sqrt(2)):
+    def ucb1(self, log_parent_visits, c=SQRT2):
+        # log_parent_visits is math.log(self.parent.visits), computed once by the caller for all siblings
         if self.visits == 0:
             return float('inf')
-        return (self.wins / self.visits) + c * math.sqrt(math.log(self.parent.visits) / self.visits)
+        return (self.wins / self.visits) + c * math.sqrt(log_parent_visits / self.visits)
 
     def select_child(self):
-        # Prioritize unvisited children first
-        unvisited_children = [child for child in self.children if child.visits == 0]
-        if unvisited_children:
-            return random.choice(unvisited_children) # Randomly pick one unvisited
-        
-        # If all children visited, choose based on UCB1
-        return max(self.children, key=lambda child: child.ucb1())
+        # Only called once every action has been expanded, and expand() hands each new child
+        # straight to a rollout and backpropagation, so every child has been visited here:
+        # there is no unvisited child to look for and UCB1 applies directly
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.ucb1(log_visits))
 
     def expand(self):
         if not self.untried_actions:
@@ -181,123 +257,148 @@ class MCTSNode:
 
 class PokerState:
     # Defines the current state of the poker game for a given MCTS node
-    def __init__(self, my_cards, opp_cards=None, board=None, deck=None):
-        self.my = my_cards # List of Card objects
-        self.opp = opp_cards if opp_cards is not None else [] # List of Card objects
-        self.board = board if board is not None else [] # List of Card objects
-        
-        if deck:
-            self.deck = deck 
-        else:
-            self.deck = get_deck() # Full deck for the root state
-
-        # Remove cards already in play from the deck
-        cards_in_play = set(self.my + self.opp + self.board)
-        self.deck = [card for card in self.deck if card not in cards_in_play]
+    # Cards are held as 52-bit masks (bit i set for card i)
+    __slots__ = ('my_mask', 'opp_mask', 'board_mask', 'deck_mask', 'n_board', 'has_opp')
+
+    def __init__(self, my_mask, opp_mask=0, board_mask=0, deck_mask=None):
+        # deck_mask has bit i set while card i is undealt and must already exclude the cards in play,
+        # only the root state (deck_mask=None) derives it from the full deck
+        self.my_mask = my_mask
+        self.opp_mask = opp_mask
+        self.board_mask = board_mask
+        self.n_board = board_mask.bit_count()
+        self.has_opp = opp_mask != 0
+        if deck_mask is None:
+            deck_mask = FULL_DECK_MASK & ~(my_mask | opp_mask | board_mask)
+        self.deck_mask = deck_mask
 
     def get_possible_actions(self):
+        deck = mask_to_cards(self.deck_mask) # Remaining cards, in card order
         # Determine the type of cards to deal next
         # Level 1: 1000 sampled opponent hole card combos
-        if not self.opp: # Need to deal opponent's 2 hole cards
-            if len(self.deck) < 2: return []
-            return random.sample(list(combinations(self.deck, 2)), min(1000, len(self.deck) * (len(self.deck) - 1) // 2))
+        if not self.has_opp: # Need to deal opponent's 2 hole cards
+            if len(deck) < 2: return []
+            return sample_combos(deck, 2, 1000)
         # Level 2: 1000 sampled flops (3 cards)
-        elif len(self.board) == 0: # Need to deal the 3-card flop
-            if len(self.deck) < 3: return []
-            return random.sample(list(combinations(self.deck, 3)), min(1000, len(self.deck) * (len(self.deck) - 1) * (len(self.deck) - 2) // 6))
+        elif self.n_board == 0: # Need to deal the 3-card flop
+            if len(deck) < 3: return []
+            return sample_combos(deck, 3, 1000)
         # Level 3: 1000 sampled turn cards (1 card)
-        elif len(self.board) == 3: # Need to deal the 1-card turn
-            if not self.deck: return []
-            return random.sample(self.deck, min(1000, len(self.deck)))
+        elif self.n_board == 3: # Need to deal the 1-card turn
+            if not deck: return []
+            return RNG.sample(deck, min(1000, len(deck)))
         # Level 4: 1000 sampled river cards (1 card) – Perform full hand evaluation and propagate the result
-        elif len(self.board) == 4: # Need to deal the 1-card river
-            if not self.deck: return []
-            return random.sample(self.deck, min(1000, len(self.deck)))
+        elif self.n_board == 4: # Need to deal the 1-card river
+            if not deck: return []
+            return RNG.sample(deck, min(1000, len(deck)))
         else: # Board is full (5 cards) or already dealt opponent cards
             return []
 
     def perform_action(self, action):
         # Creates a new PokerState object by adding the action (dealt cards) to the current state and updating the remaining deck
-        new_my_cards = list(self.my)
-        new_opp_cards = list(self.opp)
-        new_board = list(self.board)
-
-        # Create a copy of the current deck for the new state
-        new_deck_for_child = list(self.deck)
-        
         # Action could be a tuple of cards (for opponent, flop) or a single card (for turn, river)
-        if isinstance(action, Card):
-            cards_dealt = [action]
+        if isinstance(action, int):
+            dealt_mask = 1 << action
         else: # Assume tuple/list of cards
-            cards_dealt = list(action)
-
-        for card in cards_dealt:
-            if card in new_deck_for_child:
-                new_deck_for_child.remove(card)
-
-        if not self.opp: # Action is opponent's hole cards
-            new_opp_cards = cards_dealt
-        elif len(self.board) == 0: # Action is flop cards
-            new_board.extend(cards_dealt)
-        else: # Action is turn or river card
-            new_board.extend(cards_dealt)
-
-        return PokerState(new_my_cards, new_opp_cards, new_board, new_deck_for_child)
-
-def simulate(state):
-    # Performs a random rollout from the given state to the river
-    current_board = list(state.board)
-    current_opp_cards = list(state.opp)
-    
-    # Create a temporary deck for this simulation run
-    temp_deck = list(state.deck) # Start with the remaining cards from the state's deck
-    random.shuffle(temp_deck) # Shuffle for random dealing
-
-    # Deal missing opponent hole cards if not already known
-    if not current_opp_cards:
-        if len(temp_deck) < 2: return 0 # Not enough cards for opponent
-        current_opp_cards = [temp_deck.pop() for _ in range(2)]
-
-    # Deal remaining community cards until 5 are on the board
-    while len(current_board) < 5:
-        if not temp_deck: return 0 # Not enough cards in deck
-        current_board.append(temp_deck.pop())
-
-    # Evaluate hands
-    my_final_score = find_best_5_card_hand(state.my, current_board)
-    opp_final_score = find_best_5_card_hand(current_opp_cards, current_board)
-
-    if my_final_score > opp_final_score:
-        return 1  # Win
-    elif my_final_score == opp_final_score:
-        return 0.5 # Tie
-    else:
-        return 0 # Loss
-
-def mcts(root_state, n_sim=1000):
-    # The main MCTS algorithm loop
+            dealt_mask = cards_to_mask(action)
+
+        # Clear the dealt cards from the deck for the new state
+        new_deck_mask = self.deck_mask & ~dealt_mask
+
+        if not self.has_opp: # Action is opponent's hole cards
+            return PokerState(self.my_mask, dealt_mask, self.board_mask, new_deck_mask)
+        else: # Action is flop, turn or river cards
+            return PokerState(self.my_mask, self.opp_mask, self.board_mask | dealt_mask, new_deck_mask)
+
+def simulate_many(my_mask, opp_mask, board_mask, deck, n_opp, n_board, n):
+    # Rollout kernel on primitive masks, runs n random rollouts to the river
+    # n_opp and n_board are the number of opponent and board cards still to deal
+    # Returns the summed result over all rollouts (1 win, 0.5 tie, 0 loss each)
+    deck = list(deck) # Working copy, reordered in place
+    deck_len = len(deck)
+    needed = n_opp + n_board
+    if deck_len < needed: return 0 # Not enough cards in deck
+
+    randrange = RNG.randrange
+    total = 0
+    for _ in range(n):
+        # Partial Fisher-Yates: the first `needed` slots become a uniform random draw
+        for i in range(needed):
+            j = randrange(i, deck_len)
+            deck[i], deck[j] = deck[j], deck[i]
+
+        current_opp = opp_mask
+        current_board = board_mask
+        for i in range(n_opp):
+            current_opp |= 1 << deck[i]
+        for i in range(n_opp, needed):
+            current_board |= 1 << deck[i]
+
+        # Evaluate hands
+        my_final_score = evaluate_mask(my_mask | current_board)
+        opp_final_score = evaluate_mask(current_opp | current_board)
+
+        if my_final_score > opp_final_score:
+            total += 1  # Win
+        elif my_final_score == opp_final_score:
+            total += 0.5 # Tie
+    return total
+
+def simulate_batch(state, k=128):
+    # Performs k random rollouts from the given state in one kernel call and returns the average result
+    n_opp = 0 if state.has_opp else 2 # Deal missing opponent hole cards if not already known
+    n_board = 5 - state.n_board # Deal remaining community cards until 5 are on the board
+    if n_opp + n_board == 0:
+        k = 1 # Nothing left to deal, every rollout would give the same result
+    return simulate_many(state.my_mask, state.opp_mask, state.board_mask,
+                         mask_to_cards(state.deck_mask), n_opp, n_board, k) / k
+
+def search(root_state, n_sim, rollouts_per_leaf):
+    # The main MCTS algorithm loop, returns the root of the searched tree
+    # Each leaf is scored by the average of rollouts_per_leaf rollouts, backpropagated as one visit
     root = MCTSNode(root_state)
     for _ in range(n_sim):
         node = root
         while node.untried_actions == [] and node.children != []:
             node = node.select_child()
+        leaf_state = node.state
         if node.untried_actions:
-            node = node.expand()
-        result = simulate(node.state)
+            if node.state.n_board == 4:
+                # River level: score the river card on this node instead of allocating a child
+                # that would only ever be visited once
+                leaf_state = node.state.perform_action(node.untried_actions.pop())
+            else:
+                node = node.expand()
+                leaf_state = node.state
+        result = simulate_batch(leaf_state, rollouts_per_leaf)
         while node:
             node.update(result)
             node = node.parent
-    return root.wins / root.visits
-
-def lookup_preflop_table(card1, card2):
-    # Ensure card ranks are sorted for consistent lookup
-    r1, r2 = sorted([card1.rank_str, card2.rank_str], key=lambda r: Card.rank_values[r], reverse=True)
-    suited = is_suited(card1, card2)
-    if r1 == r2:
-        key = (r1, r2, True)  # force suited to match existing table entry
-    else:
-        key = (r1, r2, suited)
-
+    return root
+
+def search_worker(args):
+    # Runs one independent tree in a worker process and returns its root (wins, visits)
+    root_state, n_sim, rollouts_per_leaf, seed = args
+    RNG.seed(seed) # Forked workers would otherwise share the parent's RNG state
+    root = search(root_state, n_sim, rollouts_per_leaf)
+    return root.wins, root.visits
+
+def mcts(root_state, n_sim=1000, rollouts_per_leaf=128, workers=1):
+    # Estimates the win probability of root_state with n_sim MCTS iterations
+    # With workers > 1 the iterations are split across processes that each grow their own tree
+    # (root parallelization) and the root statistics are pooled
+    if workers <= 1 or n_sim < workers:
+        root = search(root_state, n_sim, rollouts_per_leaf)
+        return root.wins / root.visits
+
+    chunks = [n_sim // workers + (i < n_sim % workers) for i in range(workers)]
+    jobs = [(root_state, chunk, rollouts_per_leaf, RNG.getrandbits(64)) for chunk in chunks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(search_worker, jobs))
+    return sum(wins for wins, _ in results) / sum(visits for _, visits in results)
+
+def build_preflop_table():
+    # Flattens the preflop win rates into an int8 array indexed by (hi * 13 + lo) * 2 + suited, -1 for no entry
     table = {
         ("A", "A", True): 86, ("K", "K", True): 83, ("Q", "Q", True): 81, ("J", "J", True): 78, ("T", "T", True): 76, ("9", "9", True): 73, ("8", "8", True): 70, ("7", "7", True): 67, ("6", "6", True): 64, ("5", "5", True): 61, ("4", "4", True): 58, ("3", "3", True): 55, ("2", "2", True): 51,
         ("A", "K", True): 68, ("A", "Q", True): 67, ("A", "J", True): 67, ("A", "T", True): 66, ("A", "9", True): 64, ("A", "8", True): 64, ("A", "7", True): 63, ("A", "6", True): 62, ("A", "5", True): 62, ("A", "4", True): 61, ("A", "3", True): 60, ("A", "2", True): 59,
@@ -325,8 +426,23 @@ def lookup_preflop_table(card1, card2):
         ("4", "3", False): 38, ("4", "2", False): 36,
         ("3", "2", False): 35,
     }
-    
-    return table.get(key, None)
+
+    preflop = array('b', [-1]) * (13 * 13 * 2)
+    for (r1, r2, suited), win_rate in table.items():
+        preflop[(RANK_VALUES[r1] * 13 + RANK_VALUES[r2]) * 2 + suited] = win_rate
+    return preflop
+
+PREFLOP_TABLE = build_preflop_table()
+
+def lookup_preflop_table(card1, card2):
+    # Ensure card ranks are sorted for consistent lookup
+    r1 = card1 >> 2
+    r2 = card2 >> 2
+    hi, lo = (r1, r2) if r1 >= r2 else (r2, r1)
+    suited = r1 == r2 or is_suited(card1, card2) # force suited for pairs to match existing table entry
+
+    win_rate = PREFLOP_TABLE[(hi * 13 + lo) * 2 + suited]
+    return None if win_rate < 0 else win_rate
 
 if __name__ == "__main__":
     if len(sys.argv) != 3:
@@ -335,9 +451,9 @@ if __name__ == "__main__":
 
     card1 = sys.argv[1]
     card2 = sys.argv[2]
-    my_cards = [Card(card1), Card(card2)]
-    mcts_solver_state = PokerState(my_cards)
-    estimated_win_probability = mcts(mcts_solver_state, n_sim=1000)
+    my_cards = [parse_card(card1), parse_card(card2)]
+    mcts_solver_state = PokerState(cards_to_mask(my_cards))
+    estimated_win_probability = mcts(mcts_solver_state, n_sim=1000, workers=os.cpu_count() or 1)
     print(f"Estimated Win Probability: {estimated_win_probability:.2%}")
     expected_from_table = lookup_preflop_table(my_cards[0], my_cards[1])
     if expected_from_table is not None: